@@ -2,6 +2,7 @@ import streamlit as st
 import os
 from src.utils.helpers import QuizManager, rerun
 from src.generator.question_generator import QuestionGenerator
+from src.search.question_index import QuestionIndex
 
 # Set page configuration
 st.set_page_config(
@@ -17,8 +18,19 @@ if "questions_generated" not in st.session_state:
 if "show_results" not in st.session_state:
     st.session_state.show_results = False
 
+@st.cache_resource
+def get_question_index():
+    # One index per process, shared by every browser session
+    question_index = QuestionIndex()
+    # Pick up result CSVs saved before the index existed (already-indexed files are skipped)
+    question_index.index_results_dir("results")
+    return question_index
+
+if "search_hits" not in st.session_state:
+    st.session_state.search_hits = []
+
 if "quiz_manager" not in st.session_state:
-    st.session_state.quiz_manager = QuizManager()
+    st.session_state.quiz_manager = QuizManager(get_question_index())
 
 if "question_generator" not in st.session_state:
     st.session_state.question_generator = QuestionGenerator()
@@ -105,9 +117,69 @@ def main():
             if st.button("🔄 Reset Quiz", type="secondary"):
                 st.session_state.questions_generated = False
                 st.session_state.show_results = False
-                st.session_state.quiz_manager = QuizManager()
+                st.session_state.quiz_manager = QuizManager(get_question_index())
                 st.rerun()
 
+        # Question bank search
+        st.markdown("---")
+        with st.expander("🔎 Question Bank", expanded=False):
+            search_text = st.text_input(
+                "Search questions",
+                "",
+                help="Keywords to look for in past questions. Relevance ranking covers the 500 newest matches"
+            )
+            search_subject = st.text_input("Filter by subject", "", help="Leave empty for all subjects")
+            search_topic = st.text_input("Filter by topic", "", help="Leave empty for all topics")
+            search_type = st.selectbox(
+                "Filter by type",
+                ["Any", "MCQ", "Fill in the blank", "Numeric", "True or False"]
+            )
+            correct_rate = st.slider(
+                "Correctness rate (%)",
+                min_value=0,
+                max_value=100,
+                value=(0, 100),
+                help="Only applies to questions that have been answered at least once"
+            )
+            max_results = st.slider(
+                "Max results",
+                min_value=10,
+                max_value=200,
+                value=50,
+                step=10,
+                help="Number of matching questions to list"
+            )
+
+            if st.button("🔍 Search"):
+                rate_filtered = correct_rate != (0, 100)
+                try:
+                    st.session_state.search_hits = get_question_index().search(
+                        text=search_text,
+                        subject=search_subject.strip() or None,
+                        topic=search_topic.strip() or None,
+                        question_type=None if search_type == "Any" else search_type,
+                        min_correct_rate=correct_rate[0] / 100 if rate_filtered else None,
+                        max_correct_rate=correct_rate[1] / 100 if rate_filtered else None,
+                        limit=max_results
+                    )
+                except Exception as e:
+                    st.error(f"❌ Search failed: {str(e)}")
+
+            hits = st.session_state.search_hits
+            if hits:
+                st.caption(f"Found {len(hits)} question(s):")
+                for hit in hits:
+                    rate = f"{hit['correct_rate'] * 100:.0f}% correct" if hit['correct_rate'] is not None else "not answered yet"
+                    st.caption(f"• [{hit['type']}] {hit['question'][:80]} ({rate})")
+
+                # A quiz holds at most `num_questions`, so reuse the top-ranked hits
+                selected = hits[:num_questions]
+                if st.button(f"📚 Use Top {len(selected)} Questions"):
+                    if st.session_state.quiz_manager.load_questions(selected):
+                        st.session_state.questions_generated = True
+                        st.session_state.show_results = False
+                        st.rerun()
+
     # Main content area
     if st.session_state.questions_generated:
         st.header("📝 Take the Quiz")
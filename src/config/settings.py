@@ -11,4 +11,6 @@ class Settings:
 
     TEMPERATURE=0.9
 
-    MAX_RETRIES=3   #This is for the max api calls if once an api call fails then these are the max retires
\ No newline at end of file
+    MAX_RETRIES=3   #This is for the max api calls if once an api call fails then these are the max retires
+
+    SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', os.path.join('index', 'questions.db'))   #SQLite full-text index over generated questions and saved results
@@ -0,0 +1,420 @@
+import ast
+import csv
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from src.config.settings import Settings as settings
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+
+
+SCHEMA_VERSION = 3   #Bump when SCHEMA changes; older index files are dropped and rebuilt from results/
+
+# `tags` holds one exact-match token per filterable field (hex of the ASCII-lowercased value, so it
+# matches COLLATE NOCASE), which lets MATCH do the subject/topic/type filtering. Answered questions also
+# get `a1` plus the floor (`f`) and ceiling (`c`) of their correctness rate in whole percent, and the
+# tens of each (`g`, `d`), so an integer-percent rate range is an exact, short OR of tokens:
+# rate >= L% <=> f >= L, and rate <= H% <=> c <= H.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    subject TEXT NOT NULL DEFAULT '',
+    topic TEXT NOT NULL DEFAULT '',
+    difficulty TEXT NOT NULL DEFAULT '',
+    exam_type TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '[]',
+    correct_answer TEXT NOT NULL DEFAULT '',
+    explanation TEXT NOT NULL DEFAULT '',
+    times_served INTEGER NOT NULL DEFAULT 0,
+    times_answered INTEGER NOT NULL DEFAULT 0,
+    times_correct INTEGER NOT NULL DEFAULT 0,
+    correct_rate REAL GENERATED ALWAYS AS (
+        CASE WHEN times_answered > 0 THEN times_correct * 1.0 / times_answered END
+    ) VIRTUAL,
+    tags TEXT GENERATED ALWAYS AS (
+        's' || lower(hex(lower(subject))) || '0 ' ||
+        't' || lower(hex(lower(topic))) || '0 ' ||
+        'y' || lower(hex(lower(type))) || '0' ||
+        CASE WHEN times_answered > 0 THEN
+            ' a1 f' || (times_correct * 100 / times_answered) ||
+            ' g' || (times_correct * 100 / times_answered / 10) ||
+            ' c' || ((times_correct * 100 + times_answered - 1) / times_answered) ||
+            ' d' || ((times_correct * 100 + times_answered - 1) / times_answered / 10)
+        ELSE '' END
+    ) VIRTUAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_questions_correct_rate ON questions(correct_rate) WHERE times_answered > 0;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    question, explanation, subject, topic, tags,
+    content='questions', content_rowid='id', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS questions_ai AFTER INSERT ON questions BEGIN
+    INSERT INTO questions_fts(rowid, question, explanation, subject, topic, tags)
+    VALUES (new.id, new.question, new.explanation, new.subject, new.topic, new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_au AFTER UPDATE ON questions
+WHEN old.question IS NOT new.question OR old.explanation IS NOT new.explanation
+     OR old.subject IS NOT new.subject OR old.topic IS NOT new.topic OR old.tags IS NOT new.tags BEGIN
+    INSERT INTO questions_fts(questions_fts, rowid, question, explanation, subject, topic, tags)
+    VALUES ('delete', old.id, old.question, old.explanation, old.subject, old.topic, old.tags);
+    INSERT INTO questions_fts(rowid, question, explanation, subject, topic, tags)
+    VALUES (new.id, new.question, new.explanation, new.subject, new.topic, new.tags);
+END;
+
+CREATE TABLE IF NOT EXISTS indexed_files (
+    name TEXT PRIMARY KEY
+);
+"""
+
+DROP_SCHEMA = """
+DROP TRIGGER IF EXISTS questions_ai;
+DROP TRIGGER IF EXISTS questions_au;
+DROP TABLE IF EXISTS questions_fts;
+DROP TABLE IF EXISTS questions;
+DROP TABLE IF EXISTS indexed_files;
+"""
+
+# Scratch table for relevance ranking. bm25 on questions_fts would first count every matching document
+# in the whole index for each term, which grows with the corpus; ranking a copy of the candidate window
+# keeps the cost bounded by RANK_WINDOW.
+RANK_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS temp.rank_window USING fts5(
+    question, explanation, subject, topic, content='', tokenize='porter unicode61'
+);
+"""
+
+TEXT_COLUMNS = "{question explanation subject topic}"
+
+UPSERT_SQL = """
+INSERT INTO questions (content_hash, subject, topic, difficulty, exam_type, type, question,
+                       options, correct_answer, explanation, times_served, times_answered, times_correct)
+VALUES (:content_hash, :subject, :topic, :difficulty, :exam_type, :type, :question,
+        :options, :correct_answer, :explanation, :served, :answered, :correct)
+ON CONFLICT(content_hash) DO UPDATE SET
+    subject = CASE WHEN questions.subject = '' THEN excluded.subject ELSE questions.subject END,
+    topic = CASE WHEN questions.topic = '' THEN excluded.topic ELSE questions.topic END,
+    difficulty = CASE WHEN questions.difficulty = '' THEN excluded.difficulty ELSE questions.difficulty END,
+    exam_type = CASE WHEN questions.exam_type = '' THEN excluded.exam_type ELSE questions.exam_type END,
+    times_served = questions.times_served + excluded.times_served,
+    times_answered = questions.times_answered + excluded.times_answered,
+    times_correct = questions.times_correct + excluded.times_correct
+"""
+
+RESULT_COLUMNS = ["id", "subject", "topic", "difficulty", "exam_type", "type", "question", "options",
+                  "correct_answer", "explanation", "times_served", "times_answered", "times_correct", "correct_rate"]
+
+CACHE_SIZE_KB = 64 * 1024   #SQLite page cache for the shared connection
+
+MMAP_SIZE = 256 * 1024 * 1024   #Memory-map the index file so warm reads skip the read() syscalls
+
+MERGE_PAGES = 64   #Incremental FTS segment merging per write, so counter updates don't fragment the index
+
+RANK_WINDOW = 500   #Only the newest matches (after all filters) up to this count are relevance-ranked
+
+
+class QuestionIndex:
+    """SQLite FTS5 index over every generated question and every saved quiz result.
+
+    Subject, topic, difficulty and exam type are read from each question or result dict, so a
+    mixed set of questions (e.g. reused search hits) keeps its own metadata per row.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.SEARCH_INDEX_PATH
+        self.logger = get_logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+
+        try:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            # One long-lived connection keeps SQLite's page cache and the FTS5 structure warm between
+            # searches. The app shares one instance across sessions, so the lock serialises their threads.
+            self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+            self._conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+            with self._connect() as conn:
+                if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    self.logger.info("Question index schema changed; rebuilding")
+                    conn.executescript(DROP_SCHEMA)
+                conn.executescript(SCHEMA)
+                conn.executescript(RANK_TABLE)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except Exception as e:
+            self.logger.error(f"Failed to initialise question index: {str(e)}")
+            raise CustomException("Failed to initialise question index", e)
+
+    @contextmanager
+    def _connect(self):
+        with self._lock, self._conn:
+            yield self._conn
+
+    @staticmethod
+    def _merge(conn):
+        # Each answer rewrites its question's FTS row (the rate tokens change); merge a few pages per
+        # write so segments and tombstones don't pile up and slow down MATCH walks.
+        conn.execute("INSERT INTO questions_fts(questions_fts, rank) VALUES ('merge', ?)", (MERGE_PAGES,))
+
+    @staticmethod
+    def _content_hash(question_type: str, question: str) -> str:
+        normalized = " ".join(str(question).lower().split())
+        return hashlib.sha1(f"{question_type}|{normalized}".encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _row_params(cls, q: dict, served: int = 0, answered: int = 0, correct: int = 0) -> dict:
+        return {
+            'content_hash': cls._content_hash(q['type'], q['question']),
+            'subject': (q.get('subject') or '').strip(),
+            'topic': (q.get('topic') or '').strip(),
+            'difficulty': (q.get('difficulty') or '').strip(),
+            'exam_type': (q.get('exam_type') or '').strip(),
+            'type': q['type'],
+            'question': q['question'],
+            'options': json.dumps(list(q.get('options') or [])),
+            'correct_answer': str(q.get('correct_answer', '')),
+            'explanation': q.get('explanation') or '',
+            'served': served,
+            'answered': answered,
+            'correct': correct,
+        }
+
+    def add_questions(self, questions: list):
+        """Index questions as they are served; repeats only bump their served count."""
+        if not questions:
+            return
+
+        try:
+            params = [self._row_params(q, served=1) for q in questions]
+            with self._connect() as conn:
+                conn.executemany(UPSERT_SQL, params)
+                self._merge(conn)
+            self.logger.info(f"Indexed {len(params)} served question(s)")
+        except Exception as e:
+            self.logger.error(f"Failed to index questions: {str(e)}")
+            raise CustomException("Failed to index questions", e)
+
+    def add_results(self, results: list, source: str = None, served: int = 0):
+        """Fold quiz result rows into the answered/correct counts.
+
+        With `source`, the file name is registered in the same transaction and the rows are only
+        counted if nobody registered that file first, so each result file is counted at most once.
+        """
+        if not results and not source:
+            return
+
+        try:
+            params = [
+                self._row_params(r, served=served, answered=1, correct=int(self._is_true(r.get('is_correct'))))
+                for r in results
+            ]
+            with self._connect() as conn:
+                if source:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO indexed_files (name) VALUES (?)", (os.path.basename(source),)
+                    )
+                    if cursor.rowcount == 0:
+                        self.logger.info(f"Skipped {source}: already indexed")
+                        return
+                conn.executemany(UPSERT_SQL, params)
+                self._merge(conn)
+            self.logger.info(f"Indexed {len(params)} result row(s){f' from {source}' if source else ''}")
+        except Exception as e:
+            self.logger.error(f"Failed to index results: {str(e)}")
+            raise CustomException("Failed to index results", e)
+
+    def index_results_dir(self, results_dir: str = "results") -> int:
+        """Backfill result CSVs that have not been indexed yet. Returns the number of files read.
+
+        Result files are treated as immutable and keyed by file name, so touching or re-copying
+        them never counts their answers twice.
+        """
+        try:
+            with self._connect() as conn:
+                seen = {row['name'] for row in conn.execute("SELECT name FROM indexed_files")}
+
+            indexed = 0
+            for path in sorted(glob.glob(os.path.join(results_dir, "*.csv"))):
+                if os.path.basename(path) in seen:
+                    continue
+
+                with open(path, newline="", encoding="utf-8") as f:
+                    rows = [self._parse_csv_row(row) for row in csv.DictReader(f)]
+                # Backfilled rows never went through add_questions, so count them as served here.
+                self.add_results([r for r in rows if r], source=path, served=1)
+                indexed += 1
+
+            if indexed:
+                # A bulk load leaves many small segments behind; fold them into one
+                with self._connect() as conn:
+                    conn.execute("INSERT INTO questions_fts(questions_fts) VALUES ('optimize')")
+
+            return indexed
+
+        except CustomException:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to index results directory: {str(e)}")
+            raise CustomException("Failed to index results directory", e)
+
+    @staticmethod
+    def _parse_csv_row(row: dict):
+        if not row.get('question') or not row.get('type'):
+            return None
+
+        try:
+            options = ast.literal_eval(row.get('options') or '[]')
+        except (ValueError, SyntaxError):
+            options = []
+
+        # Older result files predate the subject/topic/difficulty/exam_type columns.
+        return {
+            'subject': row.get('subject') or '',
+            'topic': row.get('topic') or '',
+            'difficulty': row.get('difficulty') or '',
+            'exam_type': row.get('exam_type') or '',
+            'type': row['type'],
+            'question': row['question'],
+            'options': options,
+            'correct_answer': row.get('correct_answer', ''),
+            'explanation': row.get('explanation', ''),
+            'is_correct': row.get('is_correct'),
+        }
+
+    @staticmethod
+    def _is_true(value) -> bool:
+        if isinstance(value, str):
+            return value.strip().lower() == "true"
+        return bool(value)
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        # Quote every term so user input can never be parsed as FTS5 syntax; terms are ANDed.
+        terms = re.findall(r"\w+", text or "")
+        return " ".join(f'"{term}"' for term in terms)
+
+    @staticmethod
+    def _tag(prefix: str, value: str) -> str:
+        # Mirrors the `tags` generated column: SQLite's lower() only folds ASCII.
+        folded = "".join(c.lower() if "A" <= c <= "Z" else c for c in value.strip())
+        return f'"{prefix}{folded.encode("utf-8").hex()}0"'
+
+    @staticmethod
+    def _percent_tokens(unit: str, tens: str, low: int, high: int) -> str:
+        # Whole decades collapse into one `tens` token, e.g. 40..60 -> g4 OR g5 OR f60.
+        tokens, p = [], low
+        while p <= high:
+            if p % 10 == 0 and p + 9 <= high:
+                tokens.append(f'"{tens}{p // 10}"')
+                p += 10
+            else:
+                tokens.append(f'"{unit}{p}"')
+                p += 1
+        return "(" + " OR ".join(tokens) + ")"
+
+    @classmethod
+    def _rate_tags(cls, min_correct_rate: float = None, max_correct_rate: float = None) -> str:
+        # Whole-percent bounds are matched exactly; fractional ones widen to the enclosing percent and
+        # the correct_rate clauses trim the edge. Since f <= c, both can be narrowed to [low, high].
+        low, high = 0, 100
+        if min_correct_rate is not None:
+            low = min(100, max(0, math.floor(round(min_correct_rate * 100, 6))))
+        if max_correct_rate is not None:
+            high = min(100, max(0, math.ceil(round(max_correct_rate * 100, 6))))
+
+        terms = []
+        if low > 0:
+            terms.append(cls._percent_tokens("f", "g", low, high))
+        if high < 100:
+            terms.append(cls._percent_tokens("c", "d", low, high))
+        return "tags : " + (" AND ".join(terms) if terms else '"a1"')
+
+    def search(self, text: str = "", subject: str = None, topic: str = None, question_type: str = None,
+               min_correct_rate: float = None, max_correct_rate: float = None, limit: int = 20) -> list:
+        """Full-text search with optional filters.
+
+        Subject, topic and type are exact, case-insensitive matches, and correctness-rate filters skip
+        never-answered questions. All filters narrow the candidates before the newest RANK_WINDOW of
+        them are ranked by relevance, so a filter never hides an older qualifying question.
+        """
+        words = self._fts_query(text)
+        rate_filtered = min_correct_rate is not None or max_correct_rate is not None
+
+        terms = []
+        if words:
+            terms.append(f"{TEXT_COLUMNS} : ({words})")
+        if subject and subject.strip():
+            terms.append(f"tags : {self._tag('s', subject)}")
+        if topic and topic.strip():
+            terms.append(f"tags : {self._tag('t', topic)}")
+        if question_type:
+            terms.append(f"tags : {self._tag('y', question_type)}")
+        if rate_filtered:
+            terms.append(self._rate_tags(min_correct_rate, max_correct_rate))
+        match = " AND ".join(terms)
+
+        clauses, params = [], []
+        if min_correct_rate is not None:
+            clauses.append("q.correct_rate >= ?")
+            params.append(float(min_correct_rate))
+        if max_correct_rate is not None:
+            clauses.append("q.correct_rate <= ?")
+            params.append(float(max_correct_rate))
+
+        columns = ", ".join(f"q.{col}" for col in RESULT_COLUMNS)
+
+        try:
+            with self._connect() as conn:
+                if not match:
+                    rows = conn.execute(
+                        f"SELECT {columns} FROM questions q ORDER BY q.id DESC LIMIT ?", (int(limit),)
+                    ).fetchall()
+                else:
+                    # Walking the FTS rowids newest-first is cheap and every filter is in the MATCH,
+                    # so the walk stops as soon as the window is full.
+                    where = "".join(f" AND {c}" for c in clauses)
+                    rows = conn.execute(
+                        f"SELECT {columns} FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid "
+                        f"WHERE questions_fts MATCH ?{where} ORDER BY questions_fts.rowid DESC LIMIT ?",
+                        [match] + params + [RANK_WINDOW if words else int(limit)],
+                    ).fetchall()
+                    if words:
+                        rows = self._rank(conn, rows, words, limit)
+        except Exception as e:
+            self.logger.error(f"Question search failed: {str(e)}")
+            raise CustomException("Question search failed", e)
+
+        hits = []
+        for row in rows:
+            hit = {col: row[col] for col in RESULT_COLUMNS}
+            hit['options'] = json.loads(hit['options'])
+            hits.append(hit)
+        return hits
+
+    @staticmethod
+    def _rank(conn, rows: list, words: str, limit: int) -> list:
+        conn.execute("INSERT INTO temp.rank_window(rank_window) VALUES ('delete-all')")
+        conn.executemany(
+            "INSERT INTO temp.rank_window(rowid, question, explanation, subject, topic) VALUES (?, ?, ?, ?, ?)",
+            [(row['id'], row['question'], row['explanation'], row['subject'], row['topic']) for row in rows],
+        )
+        ranked = conn.execute(
+            "SELECT rowid FROM temp.rank_window WHERE rank_window MATCH ? ORDER BY rank, rowid DESC LIMIT ?",
+            (words, int(limit)),
+        ).fetchall()
+        by_id = {row['id']: row for row in rows}
+        return [by_id[r['rowid']] for r in ranked]
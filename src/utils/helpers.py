@@ -3,15 +3,18 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from src.generator.question_generator import QuestionGenerator
+from src.search.question_index import QuestionIndex
 
 def rerun():
     st.session_state['rerun_trigger'] = not st.session_state.get('rerun_trigger', False)
 
 class QuizManager:
-    def __init__(self):
+    def __init__(self, question_index: QuestionIndex = None):
         self.questions = []
         self.user_answers = []
         self.results = []
+        self.question_index = question_index
+        self.results_indexed = False
 
     def generate_questions(self, generator: QuestionGenerator, subject: str, topic: str, difficulty: str, question_type: str, num_questions: int, exam_type: str = "GATE"):
         self.questions = []
@@ -61,8 +64,44 @@ class QuizManager:
             st.error(f"Error generating question: {e}")
             return False
 
+        for q in self.questions:
+            q.update({'subject': subject, 'topic': topic, 'difficulty': difficulty, 'exam_type': exam_type})
+
+        self._index_questions()
         return True
 
+    def load_questions(self, questions: list):
+        """Serve previously indexed questions (e.g. from QuestionIndex.search) without calling the LLM."""
+        self.questions = [
+            {
+                'type': q['type'],
+                'question': q['question'],
+                'options': q.get('options') or [],
+                'correct_answer': q['correct_answer'],
+                'explanation': q.get('explanation') or "No explanation provided.",
+                # Hits can come from different quizzes, so each keeps its own metadata
+                'subject': q.get('subject', ""),
+                'topic': q.get('topic', ""),
+                'difficulty': q.get('difficulty', ""),
+                'exam_type': q.get('exam_type', "")
+            }
+            for q in questions
+        ]
+        self.user_answers = []
+        self.results = []
+
+        self._index_questions()
+        return bool(self.questions)
+
+    def _index_questions(self):
+        if not self.question_index:
+            return
+
+        try:
+            self.question_index.add_questions(self.questions)
+        except Exception as e:
+            st.warning(f"Could not update question index: {e}")
+
     def attempt_quiz(self):
         self.user_answers = []
 
@@ -91,6 +130,7 @@ class QuizManager:
 
     def evaluate_quiz(self):
         self.results = []
+        self.results_indexed = False
 
         for i, (q, user_ans) in enumerate(zip(self.questions, self.user_answers)):
             correct_ans = q['correct_answer']
@@ -108,7 +148,11 @@ class QuizManager:
                 'user_answer': user_ans,
                 'correct_answer': correct_ans,
                 'is_correct': is_correct,
-                'explanation': q.get('explanation', "No explanation provided.")
+                'explanation': q.get('explanation', "No explanation provided."),
+                'subject': q.get('subject', ""),
+                'topic': q.get('topic', ""),
+                'difficulty': q.get('difficulty', ""),
+                'exam_type': q.get('exam_type', "")
             })
 
     def generate_result_dataframe(self):
@@ -128,10 +172,22 @@ class QuizManager:
         os.makedirs("results", exist_ok=True)
         full_path = os.path.join("results", filename)
 
+        # Count the answers and register the file name in one transaction before the file exists, so the
+        # results/ backfill can never count it too. The results page saves on every rerun; later copies
+        # are only registered. If indexing fails, the unregistered file is counted once by the backfill.
+        if self.question_index:
+            try:
+                rows = [] if self.results_indexed else self.results
+                self.question_index.add_results(rows, source=full_path)
+            except Exception as e:
+                st.warning(f"Could not update question index: {e}")
+            self.results_indexed = True
+
         try:
             df.to_csv(full_path, index=False)
             st.success("Results saved successfully.")
-            return full_path
         except Exception as e:
             st.error(f"Failed to save results: {e}")
             return None
+
+        return full_path
@@ -0,0 +1,263 @@
+import csv
+import os
+import shutil
+import pytest
+from src.search import question_index
+from src.search.question_index import QuestionIndex
+
+
+RESULT_FIELDS = ["question_number", "question", "type", "options", "user_answer", "correct_answer",
+                 "is_correct", "explanation"]
+
+
+def make_question(text, subject="Computer Networks", topic="TCP", question_type="MCQ", **extra):
+    question = {
+        'type': question_type,
+        'question': text,
+        'options': ["A", "B", "C", "D"],
+        'correct_answer': "A",
+        'explanation': "Because.",
+        'subject': subject,
+        'topic': topic,
+        'difficulty': "Medium",
+        'exam_type': "GATE",
+    }
+    question.update(extra)
+    return question
+
+
+def write_results_csv(path, rows, fields=RESULT_FIELDS):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i, row in enumerate(rows, 1):
+            writer.writerow({'question_number': i, 'options': "['A', 'B']", 'user_answer': "A",
+                             'correct_answer': "A", 'explanation': "", **row})
+
+
+@pytest.fixture
+def index(tmp_path):
+    return QuestionIndex(str(tmp_path / "index" / "questions.db"))
+
+
+def test_upsert_dedups_and_accumulates_counters(index):
+    index.add_questions([make_question("What does TCP slow start do?")])
+    index.add_questions([make_question("  what does TCP   slow start do? ")])
+    index.add_results([
+        make_question("What does TCP slow start do?", is_correct=True),
+        make_question("What does TCP slow start do?", is_correct="False"),
+    ])
+
+    hits = index.search("slow start")
+    assert len(hits) == 1
+    assert hits[0]['times_served'] == 2
+    assert hits[0]['times_answered'] == 2
+    assert hits[0]['times_correct'] == 1
+    assert hits[0]['correct_rate'] == 0.5
+
+
+def test_same_text_different_type_is_a_separate_question(index):
+    index.add_questions([
+        make_question("TCP uses a three-way handshake", question_type="MCQ"),
+        make_question("TCP uses a three-way handshake", question_type="True or False"),
+    ])
+
+    assert len(index.search("handshake")) == 2
+    assert len(index.search("handshake", question_type="True or False")) == 1
+
+
+def test_metadata_is_kept_per_row(index):
+    index.add_questions([
+        make_question("What is the TCP congestion window?", subject="", topic=""),
+        make_question("What does the heart pump?", subject="Biology", topic="Circulation"),
+    ])
+    # A later sighting fills in blanks from its own metadata but never relabels a known subject
+    index.add_questions([
+        make_question("What is the TCP congestion window?", subject="Computer Networks", topic="TCP"),
+        make_question("What does the heart pump?", subject="Physics", topic="Fluids"),
+    ])
+
+    assert [h['subject'] for h in index.search("congestion window")] == ["Computer Networks"]
+    assert [h['subject'] for h in index.search("heart")] == ["Biology"]
+    assert index.search("congestion", subject="Biology") == []
+
+
+def test_subject_and_topic_filters_are_exact_and_case_insensitive(index):
+    index.add_questions([
+        make_question("What triggers TCP fast retransmit?", subject="Computer Networks", topic="TCP"),
+        make_question("What triggers a TCP timeout?", subject="Computer Networks Lab", topic="TCP Timers"),
+    ])
+
+    assert len(index.search("tcp", subject="computer networks")) == 1
+    assert len(index.search("tcp", subject="Computer")) == 0
+    assert len(index.search("tcp", topic="tcp timers")) == 1
+    assert len(index.search("", subject="COMPUTER NETWORKS", topic="tcp")) == 1
+
+
+def test_filters_are_not_starved_by_newer_matches(index, monkeypatch):
+    monkeypatch.setattr(question_index, "RANK_WINDOW", 5)
+    index.add_questions([make_question(f"TCP question {i}", subject="Old") for i in range(3)])
+    index.add_questions([make_question(f"TCP question {i + 3}", subject="New") for i in range(20)])
+
+    assert len(index.search("tcp", subject="Old", limit=50)) == 3
+    assert len(index.search("tcp", limit=50)) == 5
+
+
+def test_rate_filters_are_not_starved_by_newer_matches(index, monkeypatch):
+    monkeypatch.setattr(question_index, "RANK_WINDOW", 5)
+    index.add_results([make_question(f"TCP old {i}", is_correct=False) for i in range(3)])
+    index.add_results([make_question(f"TCP new {i}", is_correct=True) for i in range(20)])
+
+    assert len(index.search("tcp", max_correct_rate=0.0, limit=50)) == 3
+    assert len(index.search("tcp", min_correct_rate=0.5, max_correct_rate=0.5, limit=50)) == 0
+    assert len(index.search("", max_correct_rate=0.0, limit=50)) == 3
+    assert len(index.search("tcp", min_correct_rate=1.0, limit=50)) == 5
+
+
+def test_fractional_rate_bounds_are_exact(index):
+    index.add_results([make_question("Router third", is_correct=c) for c in (True, False, False)])
+    index.add_results([make_question("Router two thirds", is_correct=c) for c in (True, True, False)])
+
+    def found(**filters):
+        return sorted(h['question'] for h in index.search("router", **filters))
+
+    assert found(min_correct_rate=1 / 3) == ["Router third", "Router two thirds"]
+    assert found(min_correct_rate=0.334) == ["Router two thirds"]
+    assert found(max_correct_rate=0.333) == []
+    assert found(max_correct_rate=2 / 3) == ["Router third", "Router two thirds"]
+    assert found(min_correct_rate=0.34, max_correct_rate=0.66) == []
+
+
+def test_rate_ranges_across_decades_match_exact_rates(index):
+    rates = {}
+    for correct in range(11):
+        text = f"Window rate {correct}"
+        index.add_results([make_question(text, is_correct=i < correct) for i in range(10)])
+        rates[text] = correct / 10
+
+    for low, high in [(0.0, 0.39), (0.1, 1.0), (0.4, 0.6), (0.35, 0.95), (0.2, 0.2), (None, 0.6), (0.4, None)]:
+        expected = sorted(text for text, rate in rates.items()
+                          if (low is None or rate >= low) and (high is None or rate <= high))
+        found = sorted(h['question'] for h in index.search("window", min_correct_rate=low,
+                                                             max_correct_rate=high, limit=50))
+        assert found == expected, (low, high)
+
+
+def test_rate_tokens_follow_new_answers(index):
+    index.add_results([make_question("Queue question", is_correct=False)])
+    assert len(index.search("queue", max_correct_rate=0.0)) == 1
+
+    index.add_results([make_question("Queue question", is_correct=True)])
+    assert index.search("queue", max_correct_rate=0.0) == []
+    assert index.search("queue", min_correct_rate=0.5, max_correct_rate=0.5)[0]['correct_rate'] == 0.5
+
+
+def test_correct_rate_filter_boundaries(index):
+    results = []
+    for text, answers in [("rate zero", [False, False]), ("rate half", [True, False]), ("rate one", [True, True])]:
+        results += [make_question(f"Packet {text}", is_correct=a) for a in answers]
+    index.add_results(results)
+    index.add_questions([make_question("Packet never answered")])
+
+    def found(**filters):
+        return sorted(h['question'] for h in index.search("packet", **filters))
+
+    assert len(found()) == 4
+    assert found(min_correct_rate=0.5) == ["Packet rate half", "Packet rate one"]
+    assert found(max_correct_rate=0.5) == ["Packet rate half", "Packet rate zero"]
+    assert found(min_correct_rate=0.5, max_correct_rate=0.5) == ["Packet rate half"]
+    assert found(min_correct_rate=0.0, max_correct_rate=1.0) == ["Packet rate half", "Packet rate one", "Packet rate zero"]
+    assert len(index.search("", min_correct_rate=1.0)) == 1
+
+
+@pytest.mark.parametrize("text", ['"', 'tcp"', 'NEAR(', 'NEAR(tcp window', 'AND', 'tcp OR', '*', 'subject:tcp',
+                                  '{question}', '^tcp', '-', "tcp' --"])
+def test_search_text_is_never_parsed_as_fts_syntax(index, text):
+    index.add_questions([make_question("Compare TCP and UDP window handling")])
+
+    assert isinstance(index.search(text), list)
+
+
+def test_operator_words_are_searched_literally(index):
+    index.add_questions([make_question("Compare TCP and UDP"), make_question("Is NEAR field coding used?")])
+
+    assert [h['question'] for h in index.search("AND")] == ["Compare TCP and UDP"]
+    assert [h['question'] for h in index.search("NEAR(")] == ["Is NEAR field coding used?"]
+    assert index.search("tcp OR udp") == []
+
+
+def test_backfill_is_idempotent(index, tmp_path):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    path = results_dir / "quiz_results_20250804_181105.csv"
+    write_results_csv(path, [
+        {'question': "What is AIMD?", 'type': "MCQ", 'is_correct': "True"},
+        {'question': "What is RED?", 'type': "MCQ", 'is_correct': "False"},
+    ])
+
+    assert index.index_results_dir(str(results_dir)) == 1
+    assert index.index_results_dir(str(results_dir)) == 0
+
+    # Touching or re-copying a result file must not count its answers again
+    os.utime(path, (1, 1))
+    copy_dir = tmp_path / "copy"
+    shutil.copytree(results_dir, copy_dir)
+    assert index.index_results_dir(str(results_dir)) == 0
+    assert index.index_results_dir(str(copy_dir)) == 0
+
+    hit = index.search("AIMD")[0]
+    assert (hit['times_served'], hit['times_answered'], hit['times_correct']) == (1, 1, 1)
+
+
+def test_backfill_reads_metadata_columns_when_present(index, tmp_path):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    write_results_csv(results_dir / "legacy.csv", [{'question': "What is cwnd?", 'type': "MCQ", 'is_correct': "True"}])
+    write_results_csv(
+        results_dir / "current.csv",
+        [{'question': "What is ssthresh?", 'type': "MCQ", 'is_correct': "True", 'subject': "Computer Networks",
+          'topic': "TCP", 'difficulty': "Hard", 'exam_type': "GATE"}],
+        fields=RESULT_FIELDS + ["subject", "topic", "difficulty", "exam_type"],
+    )
+
+    assert index.index_results_dir(str(results_dir)) == 2
+    assert [h['question'] for h in index.search("", subject="Computer Networks")] == ["What is ssthresh?"]
+    assert index.search("ssthresh")[0]['difficulty'] == "Hard"
+    assert index.search("cwnd")[0]['subject'] == ""
+
+
+def test_saved_file_is_not_backfilled_again(index, tmp_path):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    path = results_dir / "quiz_results_1.csv"
+    write_results_csv(path, [{'question': "What is Reno?", 'type': "MCQ", 'is_correct': "True"}])
+
+    index.add_results([make_question("What is Reno?", is_correct=True)], source=str(path))
+
+    assert index.index_results_dir(str(results_dir)) == 0
+    assert index.search("Reno")[0]['times_answered'] == 1
+
+
+def test_registered_source_is_counted_once(index, tmp_path):
+    path = str(tmp_path / "quiz_results_2.csv")
+    rows = [make_question("What is BBR?", is_correct=True)]
+
+    index.add_results(rows, source=path)
+    index.add_results(rows, source=path, served=1)
+
+    hit = index.search("BBR")[0]
+    assert (hit['times_served'], hit['times_answered']) == (0, 1)
+
+
+def test_outdated_schema_is_rebuilt(tmp_path):
+    db_path = str(tmp_path / "questions.db")
+    QuestionIndex(db_path).add_questions([make_question("What is TCP Vegas?")])
+
+    index = QuestionIndex(db_path)
+    with index._connect() as conn:
+        conn.execute("PRAGMA user_version = 1")
+
+    index = QuestionIndex(db_path)
+    assert index.search("Vegas") == []
+    index.add_questions([make_question("What is TCP Vegas?")])
+    assert len(index.search("Vegas")) == 1
@@ -0,0 +1,116 @@
+import csv
+import pytest
+from src.models.question_struct import MCQ
+from src.search.question_index import QuestionIndex
+from src.utils.helpers import QuizManager
+
+
+class FakeGenerator:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_mcq(self, subject, topic, difficulty, exam_type):
+        self.calls += 1
+        return MCQ(
+            question=f"{topic} question {self.calls}?",
+            options=["A", "B", "C", "D"],
+            correct_answer="A",
+            explanation="Because.",
+        )
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return QuestionIndex(str(tmp_path / "index" / "questions.db"))
+
+
+def take_quiz(manager, answers):
+    manager.user_answers = answers
+    manager.evaluate_quiz()
+    return manager.save_to_csv()
+
+
+def test_generated_questions_are_indexed_with_their_metadata(index):
+    manager = QuizManager(index)
+    assert manager.generate_questions(FakeGenerator(), "Computer Networks", "TCP", "Medium", "Multiple Choice", 2)
+
+    hits = index.search("", subject="Computer Networks", topic="TCP")
+    assert len(hits) == 2
+    assert {(h['difficulty'], h['exam_type'], h['times_served']) for h in hits} == {("Medium", "GATE", 1)}
+
+
+def test_saved_csv_carries_metadata_and_counts_once(index):
+    manager = QuizManager(index)
+    manager.generate_questions(FakeGenerator(), "Computer Networks", "TCP", "Hard", "Multiple Choice", 2)
+    path = take_quiz(manager, ["A", "B"])
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert {(r['subject'], r['topic'], r['difficulty'], r['exam_type']) for r in rows} == {
+        ("Computer Networks", "TCP", "Hard", "GATE")
+    }
+
+    # The results page saves again on every rerun
+    manager.save_to_csv()
+
+    hits = {h['question']: h for h in index.search("", subject="Computer Networks")}
+    assert hits["TCP question 1?"]['times_answered'] == 1
+    assert hits["TCP question 1?"]['times_correct'] == 1
+    assert hits["TCP question 2?"]['times_correct'] == 0
+    assert index.index_results_dir("results") == 0
+
+
+def test_reused_questions_keep_their_difficulty_case(index):
+    manager = QuizManager(index)
+    manager.generate_questions(FakeGenerator(), "Computer Networks", "TCP", "Hard", "Multiple Choice", 1)
+
+    manager.load_questions(index.search("", subject="Computer Networks"))
+    path = take_quiz(manager, ["A"])
+
+    with open(path, newline="", encoding="utf-8") as f:
+        assert [r['difficulty'] for r in csv.DictReader(f)] == ["Hard"]
+
+
+def test_failed_indexing_does_not_count_answers_twice(index, monkeypatch):
+    manager = QuizManager(index)
+    manager.generate_questions(FakeGenerator(), "Computer Networks", "TCP", "Medium", "Multiple Choice", 1)
+    manager.user_answers = ["A"]
+    manager.evaluate_quiz()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(index, "add_results", fail)
+        first = manager.save_to_csv()
+    # Rerun of the results page, then the next startup backfill picks up the unregistered file
+    second = manager.save_to_csv("quiz_results_rerun")
+    index.index_results_dir("results")
+
+    assert first != second
+    assert index.search("", subject="Computer Networks")[0]['times_answered'] == 1
+
+
+def test_reusing_mixed_hits_keeps_each_questions_metadata(index, tmp_path):
+    results_dir = tmp_path / "legacy"
+    results_dir.mkdir()
+    with open(results_dir / "quiz_results_old.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["question_number", "question", "type", "options", "user_answer", "correct_answer",
+                         "is_correct", "explanation"])
+        writer.writerow([1, "What is the TCP congestion window?", "MCQ", "['A', 'B']", "A", "A", "True", ""])
+    index.index_results_dir(str(results_dir))
+
+    manager = QuizManager(index)
+    manager.generate_questions(FakeGenerator(), "Biology", "Circulation", "Easy", "Multiple Choice", 1)
+
+    hits = index.search("", limit=10)
+    assert manager.load_questions(hits)
+    take_quiz(manager, ["A", "A"])
+
+    legacy = index.search("congestion window")[0]
+    assert (legacy['subject'], legacy['topic']) == ("", "")
+    assert legacy['times_answered'] == 2
+    assert index.search("congestion", subject="Biology") == []
+    assert index.search("", subject="Biology")[0]['times_served'] == 2